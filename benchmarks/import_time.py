@@ -0,0 +1,80 @@
+""" Benchmark of cold start latency for the modules started by render jobs.
+
+Each module is imported in a fresh interpreter several times and the median
+wall clock time is reported next to the time of an interpreter that imports
+nothing, along with any heavy dependencies the import pulled in. Run from the
+root of the repository:
+
+    python benchmarks/import_time.py [--repeat N] [--max-ms MS]
+
+With --max-ms the script exits with an error when any module takes longer than
+MS milliseconds on top of the bare interpreter, or loads a heavy dependency,
+for the modules on the lean import path. The NumPy based modules are reported
+for reference only.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+LEAN_MODULES = [
+    "vector_mandalas.bezier",
+    "waves",
+]
+
+NUMPY_MODULES = [
+    "vector_mandalas.arrays",
+    "vector_mandalas.waves_helper",
+    "vector_mandalas.preview",
+    "vector_mandalas.export",
+    "vector_mandalas.parallel",
+]
+
+HEAVY_MODULES = ["numpy", "svgwrite", "typing"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(statement: str, repeat: int) -> float:
+    """ Returns the median wall clock time in seconds of running the statement
+        in a new interpreter """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def loaded_modules(module: str) -> list:
+    """ Returns the heavy dependencies that importing the module loads """
+    statement = "import sys, {}; print(' '.join(m for m in {!r} if m in sys.modules))".format(module, HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True, capture_output=True, text=True)
+    return output.stdout.split()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="interpreter starts per module")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail above this import time")
+    args = parser.parse_args()
+
+    baseline = time_import("pass", args.repeat)
+    print("{:<32} {:>10}".format("interpreter", "{:.1f} ms".format(baseline * 1000)))
+
+    slow = []
+    for module in LEAN_MODULES + NUMPY_MODULES:
+        extra = (time_import("import " + module, args.repeat) - baseline) * 1000
+        heavy = loaded_modules(module)
+        print("{:<32} {:>10}  {}".format(module, "+{:.1f} ms".format(extra), " ".join(heavy)))
+        if args.max_ms is not None and module in LEAN_MODULES and (extra > args.max_ms or heavy):
+            slow.append(module)
+
+    if slow:
+        sys.exit("lean import path regressed for: {}".format(", ".join(slow)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+""" Benchmark of layer stack generation throughput against the number of
+worker processes.
+
+A stack is generated from a few keyframe rings with every process count from 1
+to the number of CPUs (or --max-processes), reporting layers per second and the
+speedup over a single process. Run from the root of the repository:
+
+    python benchmarks/parallel_layers.py [--layers L] [--curves N] [--repeat R]
+
+The single process run uses the same code in this process without shared
+memory, so the speedup includes the cost of starting workers.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vector_mandalas import arrays, bezier, parallel, waves_helper  # noqa: E402
+
+
+def make_keyframes(n_curves: int) -> np.ndarray:
+    """ Returns three concentric rings of n_curves curves each """
+    circle = waves_helper.gen_circle((500, 500), 400)
+    splits = list(np.linspace(0.0, 1.0, max(1, n_curves // 4), endpoint=False)[1:])
+    curves = [part for curve in circle for part in waves_helper.split_curve(curve, splits)]
+    ring = arrays.path_to_array(bezier.Path(curves))
+    return np.stack([(ring - 500) * scale + 500 for scale in (1.0, 0.6, 0.2)])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--layers", type=int, default=4000, help="layers per stack")
+    parser.add_argument("--curves", type=int, default=400, help="curves per layer")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per process count (best is kept)")
+    parser.add_argument("--max-processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    keyframes = make_keyframes(args.curves)
+    print("{} layers x {} curves, {} CPUs".format(args.layers, keyframes.shape[1], os.cpu_count()))
+
+    baseline = None
+    for processes in range(1, args.max_processes + 1):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            parallel.generate_layers(keyframes, args.layers, 0.5, 5.0, (500, 500), 0.5, seed=0, processes=processes)
+            best = min(best, time.perf_counter() - start)
+        baseline = baseline or best
+        print("{:>3} processes {:>10.0f} layers/s {:>6.2f}x".format(processes, args.layers / best, baseline / best))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import unittest
+
+import vector_mandalas.arrays as arrays
+import vector_mandalas.bezier as bezier
+
+
+class TestArrays(unittest.TestCase):
+    """ Array conversion and checking tests """
+    def test_path_to_array(self):
+        path = bezier.Path.from_floats(
+            10, 10,
+            30, 10, 30, 10, 31, 30,
+            30, 50, 50, 30, 50, 50
+        )
+        controls = arrays.path_to_array(path)
+        self.assertEqual((2, 4, 2), controls.shape)
+        self.assertEqual([31, 30], list(controls[0, 3]))
+        self.assertIs(controls, arrays.path_to_array(controls))
+
+    def test_flatten_curves(self):
+        controls = arrays.path_to_array(bezier.Path([
+            bezier.CubicBezierCurve((10, 30), (30, 30), (10, 10), (30, 10))
+        ]))
+        points = arrays.flatten_curves(controls, 4)
+        self.assertEqual((1, 5, 2), points.shape)
+        self.assertEqual([10, 30], list(points[0, 0]))
+        self.assertEqual([20, 15], list(points[0, 2]))
+        self.assertEqual([30, 30], list(points[0, 4]))
+
+    def test_assert_continuous_array(self):
+        controls = arrays.path_to_array(bezier.Path([
+            bezier.CubicBezierCurve((10, 30), (30, 30), (10, 10), (30, 10)),
+            bezier.CubicBezierCurve((30, 30), (50, 10), (50, 30), (50, 30))
+        ]))
+        self.assertTrue(arrays.assert_continuous_array(controls))
+
+        controls[1, 0] = (30, 40)
+        self.assertFalse(arrays.assert_continuous_array(controls))
+
+        controls[1, 0] = (30, 30)
+        controls[0, 1] = (float("nan"), 10)
+        self.assertFalse(arrays.assert_continuous_array(controls))
+
+
+if __name__ == '__main__':
+    unittest.main()
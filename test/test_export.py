@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+try:
+    import ezdxf
+except ImportError:  # optional, only used to check the output against a real reader
+    ezdxf = None
+
+from vector_mandalas import arrays, export, waves_helper
+from vector_mandalas.bezier import CubicBezierCurve, Path
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.circle: Path = waves_helper.gen_circle((100, 100), 50)
+        self.broken = Path([
+            CubicBezierCurve((10, 30), (30, 30), (10, 10), (30, 10)),
+            CubicBezierCurve((40, 30), (60, 30), (40, 10), (60, 10)),
+        ])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_export(self, writer, layers, **kwargs):
+        filename = os.path.join(self.directory.name, "export")
+        writer(filename, layers, **kwargs)
+        with open(filename) as f:
+            return f.read()
+
+    def test_continuous_runs(self):
+        runs = export._continuous_runs(arrays.path_to_array(self.broken))
+        self.assertEqual([1, 1], [len(run) for run in runs])
+        runs = export._continuous_runs(arrays.path_to_array(self.circle))
+        self.assertEqual([4], [len(run) for run in runs])
+
+    def test_gcode_splines(self):
+        gcode = self.read_export(export.write_gcode, [self.circle, self.broken])
+        lines = gcode.splitlines()
+        self.assertIn("(layer 1)", lines)
+        self.assertEqual(3, lines.count("M3"))
+        self.assertEqual(6, sum(line.startswith("G5 ") for line in lines))
+        self.assertIn("G0 X100.000 Y50.000", lines)
+        self.assertIn("G5 I27.596 J0.000 P0.000 Q-27.596 X150.000 Y100.000", lines)
+
+    def test_gcode_polylines(self):
+        gcode = self.read_export(
+            export.write_gcode, [self.circle], native_curves=False, segments_per_curve=4, canvas_height=200
+        )
+        lines = gcode.splitlines()
+        self.assertEqual(16, sum(line.startswith("G1 ") for line in lines))
+        self.assertIn("G0 X100.000 Y150.000", lines)
+        self.assertEqual("G1 X100.000 Y150.000", [line for line in lines if line.startswith("G1 ")][-1])
+
+    def test_dxf_splines(self):
+        stack = arrays.path_to_array(self.circle)[None]
+        dxf = self.read_export(export.write_dxf, stack)
+        lines = dxf.splitlines()
+        self.assertEqual(["0", "SECTION", "2", "HEADER", "9", "$ACADVER", "1", "AC1015"], lines[:8])
+        self.assertIn("ENTITIES", lines)
+        self.assertIn("OBJECTS", lines)
+        self.assertEqual(["0", "EOF"], lines[-2:])
+        self.assertEqual(1, lines.count("SPLINE"))
+
+        values = lines[lines.index("SPLINE") + 1:]
+        self.assertEqual("17", values[values.index("72") + 1])  # 3 * curves + 5 knots
+        self.assertEqual("13", values[values.index("73") + 1])  # 3 * curves + 1 control points
+        knots = [float(values[i + 1]) for i, code in enumerate(values) if code == "40"]
+        self.assertEqual([0, 0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4, 4], knots)
+
+    def test_dxf_polylines(self):
+        dxf = self.read_export(export.write_dxf, [self.broken], native_curves=False, segments_per_curve=2)
+        lines = dxf.splitlines()
+        self.assertEqual(2, lines.count("LWPOLYLINE"))
+        self.assertEqual(["90", "3"], lines[lines.index("AcDbPolyline") + 1:lines.index("AcDbPolyline") + 3])
+        entities = lines[lines.index("ENTITIES"):lines.index("OBJECTS")]
+        xs = [float(value) for code, value in zip(entities[1::2], entities[2::2]) if code == "10"]
+        np.testing.assert_allclose([10, 20, 30, 40, 50, 60], xs)
+
+    def test_dxf_handles(self):
+        dxf = self.read_export(export.write_dxf, [self.circle, self.broken])
+        lines = dxf.splitlines()
+        tags = list(zip(lines[::2], lines[1::2]))
+        handles = [int(value, 16) for code, value in tags if code in ("5", "105")]
+        handle_seed = handles.pop(0)  # $HANDSEED is the first value with code 5
+        self.assertEqual(len(handles), len(set(handles)))
+        self.assertGreater(handle_seed, max(handles))
+        self.assertIn("layer_1", lines[lines.index("LAYER"):lines.index("ENTITIES")])
+
+    @unittest.skipUnless(ezdxf, "ezdxf is not installed")
+    def test_dxf_ezdxf(self):
+        for native_curves, entity in ((True, "SPLINE"), (False, "LWPOLYLINE")):
+            filename = os.path.join(self.directory.name, "export.dxf")
+            export.write_dxf(filename, [self.circle, self.broken], native_curves=native_curves)
+            doc = ezdxf.readfile(filename)
+            auditor = doc.audit()
+            self.assertEqual("AC1015", doc.dxfversion)
+            self.assertEqual([], auditor.errors)
+            self.assertEqual([], auditor.fixes)
+            entities = list(doc.modelspace())
+            self.assertEqual([entity] * 3, [e.dxftype() for e in entities])
+            self.assertEqual(["layer_0", "layer_1", "layer_1"], [e.dxf.layer for e in entities])
+
+
+if __name__ == '__main__':
+    unittest.main()
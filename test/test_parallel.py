@@ -0,0 +1,66 @@
+import gc
+import unittest
+
+import numpy as np
+
+from vector_mandalas import arrays, parallel, waves_helper
+
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        controls = arrays.path_to_array(waves_helper.gen_circle((100, 100), 50))
+        self.keyframes = np.stack([controls, (controls - 100) * 0.5 + 100])
+
+    def test_generate_layers_without_variation(self):
+        stack, valid = parallel.generate_layers(self.keyframes, 5, 0.0, 10.0, seed=1, processes=1)
+        self.assertEqual((5,) + self.keyframes.shape[1:], stack.shape)
+        self.assertTrue(valid.all())
+        np.testing.assert_allclose(self.keyframes[0], stack[0])
+        np.testing.assert_allclose(self.keyframes[1], stack[-1])
+        np.testing.assert_allclose((self.keyframes[0] + self.keyframes[1]) / 2, stack[2])
+
+    def test_generate_layers_deterministic(self):
+        serial, serial_valid = parallel.generate_layers(
+            self.keyframes, 12, 0.5, 5.0, (100, 100), 0.5, seed=3, processes=1
+        )
+        shared, shared_valid = parallel.generate_layers(
+            self.keyframes, 12, 0.5, 5.0, (100, 100), 0.5, seed=3, processes=2, chunk_size=5
+        )
+        np.testing.assert_array_equal(serial, shared)
+        np.testing.assert_array_equal(serial_valid, shared_valid)
+        self.assertTrue(shared_valid.all())
+
+        reseeded, _ = parallel.generate_layers(self.keyframes, 12, 0.5, 5.0, seed=4, processes=1)
+        self.assertFalse(np.array_equal(serial, reseeded))
+
+    def test_shared_layers(self):
+        expected, expected_valid = parallel.generate_layers(self.keyframes, 6, 0.5, 5.0, seed=5, processes=1)
+        for processes in (1, 2):
+            with parallel.shared_layers(self.keyframes, 6, 0.5, 5.0, seed=5, processes=processes) as (stack, valid):
+                np.testing.assert_array_equal(expected, stack)
+                np.testing.assert_array_equal(expected_valid, valid)
+
+    def test_shared_layers_after_block(self):
+        expected, _ = parallel.generate_layers(self.keyframes, 6, 0.5, 5.0, seed=5, processes=1)
+        with parallel.shared_layers(self.keyframes, 6, 0.5, 5.0, seed=5, processes=1) as (stack, valid):
+            view = stack[2:]
+        self.assertTrue(valid.all())
+        np.testing.assert_array_equal(expected, stack)
+
+        del stack, valid
+        gc.collect()
+        np.testing.assert_array_equal(expected[2:], view)  # views keep the memory mapped
+
+    def test_generate_layers_within_keyframes(self):
+        controls = arrays.path_to_array(waves_helper.gen_circle((0, 0), 1))
+        radii = np.where(np.arange(15) % 2, 0.5, 1.0)
+        keyframes = controls[None] * radii[:, None, None, None]
+        stack, valid = parallel.generate_layers(keyframes, 200, 0.0, 0.0, seed=1, processes=1)
+        self.assertTrue(valid.all())
+        layer_radii = np.hypot(stack[..., 0], stack[..., 1])[:, :, [0, 3]]
+        self.assertGreaterEqual(layer_radii.min(), 0.5 - 1e-9)
+        self.assertLessEqual(layer_radii.max(), 1.0 + 1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+import zlib
+
+import numpy as np
+
+from vector_mandalas import arrays, preview, waves_helper
+
+
+class TestPreview(unittest.TestCase):
+    def test_rasterize_segments(self):
+        segments = np.array([[(2.0, 5.5), (8.0, 5.5)]])
+        coverage = preview.rasterize_segments(segments, (10, 10))
+        self.assertEqual((10, 10), coverage.shape)
+        self.assertAlmostEqual(6.0, coverage.sum())
+        self.assertTrue(np.all(coverage[5, 2:8] > 0.9))
+        self.assertEqual(0.0, coverage[0, 0])
+
+    def test_rasterize_offscreen_segments(self):
+        segments = np.array([[(-50.0, -50.0), (-20.0, -40.0)]])
+        coverage = preview.rasterize_segments(segments, (10, 10))
+        self.assertEqual(0.0, coverage.sum())
+
+    def test_rasterize_in_batches(self):
+        circle = waves_helper.gen_circle((100, 100), 50)
+        points = arrays.flatten_curves(arrays.path_to_array(circle), 8)
+        segments = np.stack((points[:, :-1], points[:, 1:]), axis=2)
+        whole = preview.rasterize_segments(segments, (64, 64), 0.32)
+        batched = preview.rasterize_segments(segments, (64, 64), 0.32, batch_samples=7)
+        np.testing.assert_allclose(whole, batched, atol=1e-12)
+
+    def test_render_preview(self):
+        circle = waves_helper.gen_circle((100, 100), 50)
+        image = preview.render_preview([circle], (200, 200), size=(64, 64))
+        self.assertEqual((64, 64), image.shape)
+        self.assertEqual(np.uint8, image.dtype)
+        self.assertEqual(255, image[32, 32])  # center of the circle is empty
+        self.assertLess(image[32, 15:17].min(), 128)  # left edge of the circle is drawn
+
+        stack = arrays.path_to_array(circle)[None]
+        np.testing.assert_array_equal(image, preview.render_preview(stack, (200, 200), size=(64, 64)))
+
+    def test_write_png(self):
+        image = np.arange(12, dtype=np.uint8).reshape(3, 4)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "preview.png")
+            preview.write_png(filename, image)
+            with open(filename, "rb") as f:
+                data = f.read()
+
+        self.assertEqual(b"\x89PNG\r\n\x1a\n", data[:8])
+        idat = data.index(b"IDAT")
+        length = int.from_bytes(data[idat - 4:idat], "big")
+        scanlines = zlib.decompress(data[idat + 4:idat + 4 + length])
+        self.assertEqual(bytes([0, 0, 1, 2, 3]), scanlines[:5])
+        self.assertEqual(3 * 5, len(scanlines))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,18 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import typing
 import unittest
+from unittest import mock
 
 import numpy as np
 import svgwrite
 
-from vector_mandalas import bezier, waves_helper
+import waves
+from vector_mandalas import arrays, bezier, waves_helper
 from vector_mandalas.bezier import CubicBezierCurve, Path, Point
 
 
@@ -64,6 +73,111 @@ class TestWaves(unittest.TestCase):
         p2 = waves_helper.vary_point(p1, 1.0, np.sqrt(2), ref, 1.0)
         self.assertTrue(bezier.assert_collinear(p1, p2, ref, tolerance=1e-5))
 
+    def test_vary_layer(self):
+        controls = arrays.path_to_array(waves_helper.gen_circle((100, 100), 50))
+        rng = np.random.default_rng(0)
+        varied = waves_helper.vary_layer(controls, rng, 1.0, 5.0)
+        self.assertEqual(controls.shape, varied.shape)
+        self.assertFalse(np.array_equal(controls, varied))
+        self.assertTrue(np.all(np.hypot(*(varied - controls).reshape(-1, 2).T) <= 5.0))
+        self.assertTrue(arrays.assert_continuous_array(varied))
+        np.testing.assert_array_equal(varied[-1, 3], varied[0, 0])
+
+        unchanged = waves_helper.vary_layer(controls, rng, 0.0, 5.0)
+        np.testing.assert_array_equal(controls, unchanged)
+
+        ref = (100.0, 100.0)
+        varied = waves_helper.vary_layer(controls, rng, 1.0, 5.0, ref, 1.0)
+        for p1, p2 in zip(controls.reshape(-1, 2), varied.reshape(-1, 2)):
+            if not np.array_equal(p1, p2):
+                self.assertTrue(bezier.assert_collinear(tuple(p1), tuple(p2), ref, tolerance=1e-5))
+
+    def test_vary_layer_near_miss(self):
+        # the gap is well inside np.isclose's default tolerance but must not be closed
+        controls = np.array([
+            [(500.0, 500.0), (510.0, 490.0), (520.0, 490.0), (530.0, 500.0)],
+            [(530.005, 500.0), (540.0, 510.0), (550.0, 510.0), (560.0, 500.0)],
+            [(560.0, 500.0), (550.0, 480.0), (520.0, 480.0), (500.005, 500.0)],
+        ])
+        unchanged = waves_helper.vary_layer(controls, np.random.default_rng(0), 0.0, 5.0)
+        np.testing.assert_array_equal(controls, unchanged)
+
+    def test_interpolate_layers(self):
+        controls = arrays.path_to_array(waves_helper.gen_circle((100, 100), 50))
+        keyframes = np.stack([controls, controls * 0.5, controls * 0.25])
+        layers = waves_helper.interpolate_layers(keyframes, [0.0, 0.5, 1.0], [0.0, 0.25, 0.5, 1.0])
+        self.assertEqual((4,) + controls.shape, layers.shape)
+        np.testing.assert_allclose(keyframes[0], layers[0])
+        np.testing.assert_allclose(keyframes[1], layers[2])
+        np.testing.assert_allclose(keyframes[2], layers[3])
+
+        linear = waves_helper.interpolate_layers(keyframes[[0, 2]], [0.0, 1.0], [0.5])
+        np.testing.assert_allclose(controls * 0.625, linear[0])
+
+    def test_interpolate_many_layers(self):
+        controls = arrays.path_to_array(waves_helper.gen_circle((0, 0), 1))
+        radii = np.where(np.arange(15) % 2, 0.5, 1.0)
+        keyframes = controls[None] * radii[:, None, None, None]
+        positions = np.linspace(0.0, 1.0, 15)
+        t = np.linspace(0.0, 1.0, 500)
+
+        layers = waves_helper.interpolate_layers(keyframes, positions, t)
+        np.testing.assert_allclose(keyframes, waves_helper.interpolate_layers(keyframes, positions, positions))
+        self.assertGreaterEqual(layers.min(), keyframes.min() - 1e-12)
+        self.assertLessEqual(layers.max(), keyframes.max() + 1e-12)
+        layer_radii = np.hypot(layers[..., 0], layers[..., 1])[:, :, [0, 3]]
+        self.assertGreaterEqual(layer_radii.min(), 0.5 - 1e-9)
+        self.assertLessEqual(layer_radii.max(), 1.0 + 1e-9)
+
+        polynomial = waves_helper.interpolate_layers(keyframes, positions, t, degree=14)
+        self.assertGreater(np.abs(polynomial).max(), keyframes.max())
+
+
+class TestWavesScript(unittest.TestCase):
+    def test_lean_import(self):
+        statement = (
+            "import sys, waves, vector_mandalas.bezier; "
+            "print(sorted(set(sys.modules) & {'numpy', 'svgwrite', 'typing'}))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", statement], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        self.assertEqual("[]", output.stdout.strip())
+
+    def test_point_alias(self):
+        self.assertIs(tuple, bezier.Point)
+        self.assertIn("Point", dir(bezier))
+        self.assertIs(bezier.Point, typing.get_type_hints(bezier.CubicBezierCurve.__init__)["p0"])
+
+    def test_serve(self):
+        with tempfile.TemporaryDirectory() as directory:
+            jobs = [
+                {"file": os.path.join(directory, "a.png")},
+                {"file": os.path.join(directory, "b.dxf"), "splits_per_quad": 3, "canvas_size": [200, 200]},
+                {"file": os.path.join(directory, "c.txt")},
+                {"file": os.path.join(directory, "d.png"), "bogus": 1},
+            ]
+            stdin = io.StringIO("".join(json.dumps(job) + "\n" for job in jobs) + "\nnot json\n")
+            stdout = io.StringIO()
+            waves.serve(stdin, stdout)
+
+            results = [json.loads(line) for line in stdout.getvalue().splitlines()]
+            self.assertEqual([True, True, False, False, False], [result["ok"] for result in results])
+            self.assertEqual([job["file"] for job in jobs] + [None], [result["file"] for result in results])
+            self.assertTrue(os.path.exists(jobs[0]["file"]))
+            self.assertTrue(os.path.exists(jobs[1]["file"]))
+            self.assertIn("unsupported output format", results[2]["error"])
+            self.assertIn("TypeError", results[3]["error"])
+            self.assertIn("JSONDecodeError", results[4]["error"])
+
+    def test_serve_default_streams(self):
+        # streams replaced after import must be picked up by the defaults
+        stdin, stdout = io.StringIO("not json\n"), io.StringIO()
+        with mock.patch.object(sys, "stdin", stdin), mock.patch.object(sys, "stdout", stdout):
+            waves.serve()
+        self.assertFalse(json.loads(stdout.getvalue())["ok"])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,75 @@
+"""
+.. module:: arrays
+    :platform: OS X
+    :synopsis: module for conversion of bezier paths to and from NumPy arrays
+
+.. moduleauthor:: Duncan Hall
+"""
+
+from __future__ import division
+
+import numpy as np
+
+from vector_mandalas.bezier import Path
+
+
+##############################
+# Conversion                 #
+##############################
+
+
+def path_to_array(path: Path) -> np.ndarray:
+    """ Converts a path to an array of control points with shape (N, 4, 2), where
+        each curve is stored in drawing order as p0, c0, c1, p1. Arrays are
+        returned as float arrays without copying, so callers can pass either a
+        path or an existing control point array.
+
+        Args:
+            path (Path): path (or control point array) to convert
+    """
+    if isinstance(path, np.ndarray):
+        return path.astype(float, copy=False)
+
+    return np.array(
+        [[curve.p0, curve.c0, curve.c1, curve.p1] for curve in path], dtype=float
+    ).reshape(-1, 4, 2)
+
+
+def flatten_curves(controls: np.ndarray, segments_per_curve: int = 8) -> np.ndarray:
+    """ Evaluates every curve of a control point array at evenly spaced values of
+        t, producing a polyline approximation of each curve. The result has
+        shape (..., segments_per_curve + 1, 2).
+
+        Args:
+            controls (np.ndarray): control points with shape (..., 4, 2) as
+                returned by `path_to_array`
+            segments_per_curve (int): number of line segments per curve
+    """
+    if segments_per_curve < 1:
+        raise ValueError("flatten_curves() must be called with at least one segment per curve")
+
+    t = np.linspace(0.0, 1.0, segments_per_curve + 1)[:, None]
+    s = 1.0 - t
+    basis = np.hstack((s * s * s, 3 * s * s * t, 3 * s * t * t, t * t * t))  # Bernstein polynomials
+    return np.matmul(basis, controls)
+
+
+##############################
+# Checks                     #
+##############################
+
+
+def assert_continuous_array(controls: np.ndarray, tolerance: float = 1e-6) -> bool:
+    """ Array counterpart of `bezier.assert_continuous` which checks that every curve of
+        a control point array starts where the previous one ends and that all
+        coordinates are finite.
+
+        Args:
+            controls (np.ndarray): control points with shape (N, 4, 2)
+            tolerance (float): largest allowed gap between adjacent curves
+                (defaults to 1e-6)
+    """
+    if not len(controls):
+        raise ValueError("assert_continuous_array() cannot be called on an empty array")
+
+    return bool(np.all(np.isfinite(controls)) and np.all(np.abs(controls[:-1, 3] - controls[1:, 0]) <= tolerance))
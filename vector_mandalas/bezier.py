@@ -7,11 +7,12 @@
 """
 
 from __future__ import division
-from typing import List, Tuple
+import math
 
-import numpy as np
+# this module avoids NumPy and typing so that string-only work imports quickly;
+# the array form of paths lives in vector_mandalas.arrays
 
-Point = Tuple[float, float]
+Point = tuple  # (x, y) pair of floats
 
 
 ##############################
@@ -58,7 +59,7 @@ class CubicBezierCurve:
         self.c1 = c1 if c1 is not None else p1
 
 
-class Path(List[CubicBezierCurve]):
+class Path(list):
     """ A collection of connected bezier curves. This class also includes
         methods for construction and addition of curves to the path. Note
         that this path is ordered.
@@ -117,7 +118,7 @@ def assert_collinear(*points: Point, tolerance: float = 1e-2) -> bool:
     if len(points) < 3:
         raise ValueError("CurveChecker.assert_collinear() must be called with at least three points")
 
-    thetas = [np.arctan2(p0[1] - p1[1], p0[0] - p1[0]) for p0, p1 in zip(points, points[1:])]
+    thetas = [math.atan2(p0[1] - p1[1], p0[0] - p1[0]) for p0, p1 in zip(points, points[1:])]
     for t0, t1 in zip(thetas, thetas[1:]):
         if abs(t0 - t1) > tolerance:
             return False
@@ -165,4 +166,3 @@ def path_to_string(path: Path) -> str:
         pieces.append(piece)
 
     return " ".join(pieces)
-
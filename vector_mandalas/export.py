@@ -0,0 +1,298 @@
+"""
+.. module:: export
+    :platform: OS X
+    :synopsis: module for export of bezier paths to G-code and DXF files
+
+.. moduleauthor:: Duncan Hall
+"""
+
+from __future__ import division
+from typing import Iterable, List, Tuple
+import itertools
+
+import numpy as np
+
+from vector_mandalas.arrays import flatten_curves, path_to_array
+from vector_mandalas.bezier import Path
+
+
+##############################
+# Helpers                    #
+##############################
+
+
+def _continuous_runs(controls: np.ndarray) -> List[np.ndarray]:
+    """ Splits a control point array into runs of connected curves, breaking
+        wherever one curve does not end where the next one starts
+
+        Args:
+            controls (np.ndarray): control points with shape (N, 4, 2)
+    """
+    if not len(controls):
+        return []
+    gaps = np.any(controls[:-1, 3] != controls[1:, 0], axis=1)
+    return np.split(controls, np.flatnonzero(gaps) + 1)
+
+
+def _prepared_layers(layers: Iterable[Path], canvas_height: float = None):
+    """ Yields each layer as a control point array, mirrored vertically when a
+        canvas height is given so that the origin sits at the bottom left as
+        machines and CAD programs expect
+
+        Args:
+            layers (Iterable[Path]): paths, control point arrays or a layer stack
+            canvas_height (float): height of the drawing (defaults to no mirroring)
+    """
+    for layer in layers:
+        controls = path_to_array(layer)
+        if canvas_height is not None:
+            controls = controls * (1.0, -1.0) + (0.0, canvas_height)
+        yield controls
+
+
+def _format_rows(template: str, values: np.ndarray) -> str:
+    """ Formats every row of a 2D array with the same template in a single
+        string operation rather than one call per coordinate
+
+        Args:
+            template (str): %-style template consuming one row of values
+            values (np.ndarray): values with shape (rows, columns)
+    """
+    return (template * len(values)) % tuple(values.ravel().tolist())
+
+
+##############################
+# G-code                     #
+##############################
+
+
+def write_gcode(
+        filename: str, layers: Iterable[Path], feed_rate: float = 1000.0,
+        tool_on: str = "M3", tool_off: str = "M5", native_curves: bool = True,
+        segments_per_curve: int = 8, canvas_height: float = None, precision: int = 3
+) -> None:
+    """ Writes layers to a G-code file one layer at a time. Each run of connected
+        curves becomes a rapid move to its start followed by cutting moves with
+        the tool switched on.
+
+        With native_curves the curves are written as G5 cubic splines (as
+        understood by LinuxCNC and Marlin), otherwise they are flattened to G1
+        line moves for controllers without spline support.
+
+        Args:
+            filename (str): path of the file to write
+            layers (Iterable[Path]): paths, control point arrays or a layer stack
+            feed_rate (float): feed rate for cutting moves
+            tool_on (str): command switching the tool on (defaults to spindle/laser on)
+            tool_off (str): command switching the tool off
+            native_curves (bool): write G5 splines instead of flattened moves
+            segments_per_curve (int): line moves per curve when flattening
+            canvas_height (float): height of the drawing, used to flip the y axis
+                (defaults to no flipping)
+            precision (int): digits written after the decimal point
+    """
+    number = "%.{}f".format(precision)
+    move_template = "G0 X{0} Y{0}\n".format(number)
+    line_template = "G1 X{0} Y{0}\n".format(number)
+    spline_template = "G5 I{0} J{0} P{0} Q{0} X{0} Y{0}\n".format(number)
+
+    with open(filename, "w") as f:
+        f.write("G21\nG90\nG17\nF{}\n".format(feed_rate))
+
+        for i, controls in enumerate(_prepared_layers(layers, canvas_height)):
+            f.write("(layer {})\n".format(i))
+            for run in _continuous_runs(controls):
+                f.write(move_template % tuple(run[0, 0]))
+                f.write(tool_on + "\n")
+                if native_curves:
+                    offsets = np.hstack((
+                        run[:, 1] - run[:, 0],  # first control point relative to start
+                        run[:, 2] - run[:, 3],  # second control point relative to end
+                        run[:, 3]
+                    ))
+                    f.write(_format_rows(spline_template, offsets))
+                else:
+                    points = flatten_curves(run, segments_per_curve)[:, 1:].reshape(-1, 2)
+                    f.write(_format_rows(line_template, points))
+                f.write(tool_off + "\n")
+
+        f.write("M2\n")
+
+
+##############################
+# DXF                        #
+##############################
+
+
+def _tags(*pairs) -> str:
+    """ Formats (group code, value) pairs as DXF tag lines """
+    return "".join("{}\n{}\n".format(code, value) for code, value in pairs)
+
+
+def _dxf_table(name: str, handle: str, records: List[str], subclass: str = None) -> str:
+    """ Wraps the records of one symbol table of the TABLES section """
+    head = _tags((0, "TABLE"), (2, name), (5, handle), (330, 0), (100, "AcDbSymbolTable"), (70, len(records)))
+    if subclass is not None:
+        head += _tags((100, subclass), (71, 0))
+    return head + "".join(records) + _tags((0, "ENDTAB"))
+
+
+def _dxf_record(kind: str, handle: str, table: str, subclass: str, name: str, *pairs, handle_code: int = 5) -> str:
+    """ Formats one record of a symbol table """
+    return _tags(
+        (0, kind), (handle_code, handle), (330, table),
+        (100, "AcDbSymbolTableRecord"), (100, subclass), (2, name), (70, 0), *pairs
+    )
+
+
+def _dxf_document(layer_names: List[str], handles) -> Tuple[str, str, str]:
+    """ Builds the fixed parts of a minimal DXF R2000 (AC1015) document: the
+        CLASSES, TABLES and BLOCKS sections before the entities and the OBJECTS
+        section after them, taking a fresh handle from handles for each object.
+
+        Returns the text before the ENTITIES section, the model space block
+        record handle which owns the entities and the text after the ENTITIES
+        section.
+
+        Args:
+            layer_names (List[str]): names of the layers to declare
+            handles (Iterator[int]): source of unused handle numbers
+    """
+    h = {name: "%X" % next(handles) for name in (
+        "vport_table", "vport", "ltype_table", "byblock", "bylayer", "continuous", "layer_table",
+        "style_table", "style", "view_table", "ucs_table", "appid_table", "acad", "dimstyle_table",
+        "dimstyle", "block_record_table", "model_record", "paper_record", "model_block", "model_end",
+        "paper_block", "paper_end", "root", "groups",
+    )}
+
+    tables = [
+        _dxf_table("VPORT", h["vport_table"], [_dxf_record(
+            "VPORT", h["vport"], h["vport_table"], "AcDbViewportTableRecord", "*Active",
+            (10, 0.0), (20, 0.0), (11, 1.0), (21, 1.0), (12, 0.0), (22, 0.0), (40, 1000.0), (41, 1.0)
+        )]),
+        _dxf_table("LTYPE", h["ltype_table"], [
+            _dxf_record(
+                "LTYPE", h[key], h["ltype_table"], "AcDbLinetypeTableRecord", name,
+                (3, description), (72, 65), (73, 0), (40, 0.0)
+            )
+            for key, name, description in (
+                ("byblock", "ByBlock", ""), ("bylayer", "ByLayer", ""), ("continuous", "Continuous", "Solid line")
+            )
+        ]),
+        _dxf_table("LAYER", h["layer_table"], [
+            _dxf_record(
+                "LAYER", "%X" % next(handles), h["layer_table"], "AcDbLayerTableRecord", name,
+                (62, 7), (6, "Continuous")
+            )
+            for name in ["0"] + layer_names
+        ]),
+        _dxf_table("STYLE", h["style_table"], [_dxf_record(
+            "STYLE", h["style"], h["style_table"], "AcDbTextStyleTableRecord", "Standard",
+            (40, 0.0), (41, 1.0), (50, 0.0), (71, 0), (42, 2.5), (3, "txt"), (4, "")
+        )]),
+        _dxf_table("VIEW", h["view_table"], []),
+        _dxf_table("UCS", h["ucs_table"], []),
+        _dxf_table("APPID", h["appid_table"], [
+            _dxf_record("APPID", h["acad"], h["appid_table"], "AcDbRegAppTableRecord", "ACAD")
+        ]),
+        _dxf_table("DIMSTYLE", h["dimstyle_table"], [_dxf_record(
+            "DIMSTYLE", h["dimstyle"], h["dimstyle_table"], "AcDbDimStyleTableRecord", "Standard", handle_code=105
+        )], subclass="AcDbDimStyleTable"),
+        _dxf_table("BLOCK_RECORD", h["block_record_table"], [
+            _dxf_record("BLOCK_RECORD", h[key], h["block_record_table"], "AcDbBlockTableRecord", name)
+            for key, name in (("model_record", "*Model_Space"), ("paper_record", "*Paper_Space"))
+        ]),
+    ]
+
+    blocks = ""
+    for space, name, paper in (("model", "*Model_Space", 0), ("paper", "*Paper_Space", 1)):
+        owner = h[space + "_record"]
+        blocks += _tags(
+            (0, "BLOCK"), (5, h[space + "_block"]), (330, owner), (100, "AcDbEntity"), (67, paper), (8, "0"),
+            (100, "AcDbBlockBegin"), (2, name), (70, 0), (10, 0.0), (20, 0.0), (30, 0.0), (3, name), (1, ""),
+            (0, "ENDBLK"), (5, h[space + "_end"]), (330, owner), (100, "AcDbEntity"), (67, paper), (8, "0"),
+            (100, "AcDbBlockEnd"),
+        )
+
+    before = (
+        _tags((0, "SECTION"), (2, "CLASSES"), (0, "ENDSEC"))
+        + _tags((0, "SECTION"), (2, "TABLES")) + "".join(tables) + _tags((0, "ENDSEC"))
+        + _tags((0, "SECTION"), (2, "BLOCKS")) + blocks + _tags((0, "ENDSEC"))
+    )
+    after = _tags(
+        (0, "SECTION"), (2, "OBJECTS"),
+        (0, "DICTIONARY"), (5, h["root"]), (330, 0), (100, "AcDbDictionary"), (281, 1),
+        (3, "ACAD_GROUP"), (350, h["groups"]),
+        (0, "DICTIONARY"), (5, h["groups"]), (330, h["root"]), (100, "AcDbDictionary"), (281, 1),
+        (0, "ENDSEC"),
+    )
+    return before, h["model_record"], after
+
+
+def write_dxf(
+        filename: str, layers: Iterable[Path], native_curves: bool = True,
+        segments_per_curve: int = 8, canvas_height: float = None, precision: int = 3
+) -> None:
+    """ Writes layers to a DXF R2000 file one layer at a time, placing each layer
+        on its own DXF layer. Each run of connected curves becomes a single cubic
+        SPLINE entity, which represents the bezier curves exactly, or an
+        LWPOLYLINE of the flattened curves.
+
+        The document carries the header, tables, blocks and objects of a minimal
+        R2000 drawing, with a handle on every object. It has been verified to
+        load and audit cleanly with ezdxf.
+
+        Args:
+            filename (str): path of the file to write
+            layers (Iterable[Path]): paths, control point arrays or a layer stack
+            native_curves (bool): write SPLINE entities instead of polylines
+            segments_per_curve (int): line segments per curve when flattening
+            canvas_height (float): height of the drawing, used to flip the y axis
+                (defaults to no flipping)
+            precision (int): digits written after the decimal point
+    """
+    number = "%.{}f".format(precision)
+    point_template = "10\n{0}\n20\n{0}\n".format(number)
+    spline_point_template = "10\n{0}\n20\n{0}\n30\n0.0\n".format(number)
+
+    # the layer table and the handle seed are written before the entities, so
+    # the layers are counted up front (each entity holds at least one curve)
+    if not isinstance(layers, np.ndarray):
+        layers = list(layers)
+    handles = itertools.count(1)
+    before, owner, after = _dxf_document(["layer_{}".format(i) for i in range(len(layers))], handles)
+    first_entity = next(handles)
+    handles = itertools.count(first_entity)
+    handle_seed = first_entity + sum(len(layer) for layer in layers)
+
+    with open(filename, "w") as f:
+        f.write(_tags(
+            (0, "SECTION"), (2, "HEADER"), (9, "$ACADVER"), (1, "AC1015"),
+            (9, "$HANDSEED"), (5, "%X" % handle_seed), (0, "ENDSEC")
+        ))
+        f.write(before)
+        f.write("0\nSECTION\n2\nENTITIES\n")
+
+        for i, controls in enumerate(_prepared_layers(layers, canvas_height)):
+            header = "330\n{}\n100\nAcDbEntity\n8\nlayer_{}\n".format(owner, i)
+            for run in _continuous_runs(controls):
+                if native_curves:
+                    # a chain of n bezier curves is a clamped cubic b-spline whose
+                    # interior knots each repeat three times
+                    points = np.vstack((run[:, :3].reshape(-1, 2), run[-1:, 3]))
+                    knots = np.repeat(np.arange(len(run) + 1), 3)
+                    knots = np.concatenate(([0], knots, [len(run)]))
+                    f.write("0\nSPLINE\n5\n%X\n" % next(handles) + header)
+                    f.write("100\nAcDbSpline\n70\n8\n71\n3\n72\n{}\n73\n{}\n74\n0\n".format(len(knots), len(points)))
+                    f.write("40\n%d\n" * len(knots) % tuple(knots.tolist()))
+                    f.write(_format_rows(spline_point_template, points))
+                else:
+                    points = flatten_curves(run, segments_per_curve)
+                    points = np.vstack((points[:, :-1].reshape(-1, 2), points[-1:, -1]))
+                    f.write("0\nLWPOLYLINE\n5\n%X\n" % next(handles) + header)
+                    f.write("100\nAcDbPolyline\n90\n{}\n70\n0\n".format(len(points)))
+                    f.write(_format_rows(point_template, points))
+
+        f.write("0\nENDSEC\n")
+        f.write(after)
+        f.write("0\nEOF\n")
@@ -0,0 +1,202 @@
+"""
+.. module:: parallel
+    :platform: OS X
+    :synopsis: module for multi-process generation of layer stacks in shared memory
+
+.. moduleauthor:: Duncan Hall
+"""
+
+from __future__ import division
+from multiprocessing import shared_memory
+from typing import Iterator, List, Tuple
+import contextlib
+import multiprocessing
+import os
+import weakref
+
+import numpy as np
+
+from vector_mandalas.arrays import assert_continuous_array
+from vector_mandalas.bezier import Point
+from vector_mandalas.waves_helper import interpolate_layers, vary_layer
+
+
+##############################
+# Layer Processing           #
+##############################
+
+
+def _process_layers(stack: np.ndarray, valid: np.ndarray, start: int, stop: int, job: dict) -> None:
+    """ Interpolates, varies and validates layers start through stop - 1 of the
+        stack in place. Every layer draws from its own generator seeded with
+        (seed, layer index), so results do not depend on how layers are split
+        between processes.
+
+        Args:
+            stack (np.ndarray): layer stack with shape (L, N, 4, 2)
+            valid (np.ndarray): validation result per layer with shape (L,)
+            start (int): first layer to process
+            stop (int): layer after the last one to process
+            job (dict): keyword arguments of `generate_layers`
+    """
+    stack[start:stop] = interpolate_layers(
+        job["keyframes"], job["positions"], job["t"][start:stop], job["degree"]
+    )
+    for i in range(start, stop):
+        rng = np.random.default_rng([job["seed"], i])
+        stack[i] = vary_layer(
+            stack[i], rng, job["p"], job["max_distance"], job["reference_point"], job["reference_factor"]
+        )
+        valid[i] = assert_continuous_array(stack[i])
+
+
+_worker_state = {}
+
+
+def _attach_worker(stack_name: str, valid_name: str, shape: Tuple[int, ...], job: dict) -> None:
+    """ Pool initializer which attaches a worker process to the shared layer
+        stack once, so that only layer ranges are sent with each task """
+    stack_memory = shared_memory.SharedMemory(name=stack_name)
+    valid_memory = shared_memory.SharedMemory(name=valid_name)
+    _worker_state.update(
+        memory=(stack_memory, valid_memory),
+        stack=np.ndarray(shape, dtype=float, buffer=stack_memory.buf),
+        valid=np.ndarray(shape[:1], dtype=bool, buffer=valid_memory.buf),
+        job=job,
+    )
+
+
+def _process_range(layer_range: Tuple[int, int]) -> None:
+    """ Pool task processing one range of layers of the attached stack """
+    _process_layers(_worker_state["stack"], _worker_state["valid"], *layer_range, _worker_state["job"])
+
+
+def _make_job(
+        keyframes: np.ndarray, n_layers: int, p: float, max_distance: float, reference_point: Point,
+        reference_factor: float, positions: List[float], degree: int, seed: int
+) -> dict:
+    """ Collects the arguments of `generate_layers` that every worker needs,
+        filling in the defaults """
+    keyframes = np.asarray(keyframes, dtype=float)
+    return dict(
+        keyframes=keyframes,
+        positions=np.linspace(0.0, 1.0, len(keyframes)) if positions is None else positions,
+        t=np.linspace(0.0, 1.0, n_layers),
+        degree=degree,
+        seed=np.random.SeedSequence().entropy if seed is None else seed,
+        p=p,
+        max_distance=max_distance,
+        reference_point=reference_point,
+        reference_factor=reference_factor,
+    )
+
+
+def _process_count(processes: int, n_layers: int) -> int:
+    """ Resolves the number of worker processes to use for n_layers layers """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    return max(1, min(processes, n_layers))
+
+
+##############################
+# Functions                  #
+##############################
+
+
+@contextlib.contextmanager
+def shared_layers(
+        keyframes: np.ndarray, n_layers: int, p: float, max_distance: float,
+        reference_point: Point = None, reference_factor: float = 0.0,
+        positions: List[float] = None, degree: int = None, seed: int = None,
+        processes: int = None, chunk_size: int = None
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """ Context manager counterpart of `generate_layers` which yields the stack
+        and validation arrays backed directly by the shared memory the workers
+        wrote to, so the stack is never copied. The shared memory is unlinked
+        when the block exits and unmapped once the arrays and all views of them
+        have been garbage collected, so they stay valid after the block. Takes
+        the same arguments as `generate_layers`. """
+    job = _make_job(
+        keyframes, n_layers, p, max_distance, reference_point, reference_factor, positions, degree, seed
+    )
+    shape = (n_layers,) + job["keyframes"].shape[1:]
+    processes = _process_count(processes, n_layers)
+    if chunk_size is None:
+        chunk_size = -(-n_layers // (processes * 4))
+    chunk_size = max(1, chunk_size)
+
+    stack_memory = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+    valid_memory = shared_memory.SharedMemory(create=True, size=max(1, n_layers))
+    stack = np.ndarray(shape, dtype=float, buffer=stack_memory.buf)
+    valid = np.ndarray(shape[:1], dtype=bool, buffer=valid_memory.buf)
+
+    # every view of the arrays keeps them alive, so the mapping is closed only
+    # once nothing can read from it anymore
+    weakref.finalize(stack, stack_memory.close)
+    weakref.finalize(valid, valid_memory.close)
+    try:
+        if processes == 1:
+            _process_layers(stack, valid, 0, n_layers, job)
+        else:
+            ranges = [(start, min(start + chunk_size, n_layers)) for start in range(0, n_layers, chunk_size)]
+            with multiprocessing.Pool(
+                    processes, initializer=_attach_worker, initargs=(stack_memory.name, valid_memory.name, shape, job)
+            ) as pool:
+                pool.map(_process_range, ranges)
+
+        yield stack, valid
+    finally:
+        stack_memory.unlink()
+        valid_memory.unlink()
+
+
+def generate_layers(
+        keyframes: np.ndarray, n_layers: int, p: float, max_distance: float,
+        reference_point: Point = None, reference_factor: float = 0.0,
+        positions: List[float] = None, degree: int = None, seed: int = None,
+        processes: int = None, chunk_size: int = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """ Builds a stack of n_layers layers by interpolating between keyframe
+        layers and varying every interpolated layer, then validates each layer.
+
+        The stack lives in shared memory while worker processes fill disjoint
+        ranges of layers in place, so no curves are pickled between processes.
+        The output for a given seed is identical for any number of processes.
+
+        Returns the stack with shape (n_layers, N, 4, 2) and a boolean array
+        marking the layers that are continuous and finite. With more than one
+        process the stack is copied out of shared memory, so peak memory is
+        twice the size of the stack; use `shared_layers` to work on the shared
+        stack directly instead.
+
+    Args:
+        keyframes (np.ndarray): keyframe layers with shape (K, N, 4, 2)
+        n_layers (int): number of layers to generate
+        p (float): probability of varying each point (see `vary_layer`)
+        max_distance (float): max distance to vary each point
+        reference_point (Point): the target direction for skewing the variation
+        reference_factor (float): degree of skew toward the reference_point
+        positions (List[float]): position of each keyframe between 0.0 (first
+            layer) and 1.0 (last layer) (defaults to evenly spaced)
+        degree (int): degree of a global polynomial fit through the keyframes
+            (defaults to piecewise interpolation, see `interpolate_layers`)
+        seed (int): seed for the per-layer generators (defaults to fresh entropy)
+        processes (int): number of worker processes, 1 to run in this process
+            (defaults to the number of CPUs)
+        chunk_size (int): layers per task (defaults to spreading the layers
+            over four tasks per process)
+    """
+    if _process_count(processes, n_layers) == 1:
+        job = _make_job(
+            keyframes, n_layers, p, max_distance, reference_point, reference_factor, positions, degree, seed
+        )
+        stack = np.empty((n_layers,) + job["keyframes"].shape[1:])
+        valid = np.empty(n_layers, dtype=bool)
+        _process_layers(stack, valid, 0, n_layers, job)
+        return stack, valid
+
+    with shared_layers(
+            keyframes, n_layers, p, max_distance, reference_point, reference_factor,
+            positions, degree, seed, processes, chunk_size
+    ) as (stack, valid):
+        return stack.copy(), valid.copy()
@@ -0,0 +1,189 @@
+"""
+.. module:: preview
+    :platform: OS X
+    :synopsis: module for low resolution raster previews of bezier paths
+
+.. moduleauthor:: Duncan Hall
+"""
+
+from __future__ import division
+from typing import Iterable, Tuple
+import struct
+import zlib
+
+import numpy as np
+
+from vector_mandalas.arrays import flatten_curves, path_to_array
+from vector_mandalas.bezier import Path
+
+
+##############################
+# Rasterization              #
+##############################
+
+
+def _splat_samples(
+        buffer: np.ndarray, starts: np.ndarray, deltas: np.ndarray, lengths: np.ndarray,
+        counts: np.ndarray, size: Tuple[int, int]
+) -> None:
+    """ Samples a batch of segments and adds the bilinear weights of every sample
+        to a padded coverage buffer in place (see `rasterize_segments`) """
+    width, height = size
+    if np.all(counts == 1):
+        points = starts + deltas * 0.5
+        weights = lengths
+    else:
+        first_sample = np.cumsum(counts) - counts
+        t = np.arange(counts.sum(), dtype=float)
+        t -= np.repeat(first_sample - 0.5, counts)
+        t /= np.repeat(counts, counts)
+        points = np.repeat(starts, counts, axis=0) + np.repeat(deltas, counts, axis=0) * t[:, None]
+        weights = np.repeat(lengths / counts, counts)
+
+    # pixel centers sit at half integer coordinates; the buffer is padded by one
+    # pixel on every side so that all four neighbours of a kept sample are valid
+    x = points[:, 0] - 0.5
+    y = points[:, 1] - 0.5
+    x0 = np.floor(x)
+    y0 = np.floor(y)
+    inside = (x0 >= -1) & (x0 < width) & (y0 >= -1) & (y0 < height)
+    if not np.all(inside):
+        x, y, x0, y0, weights = x[inside], y[inside], x0[inside], y0[inside], weights[inside]
+    fx = x - x0
+    fy = y - y0
+
+    padded_width = width + 2
+    index = (y0.astype(np.intp) + 1) * padded_width + x0.astype(np.intp) + 1
+    for offset, w in ((0, (1 - fx) * (1 - fy)), (1, fx * (1 - fy)),
+                      (padded_width, (1 - fx) * fy), (padded_width + 1, fx * fy)):
+        buffer += np.bincount(index + offset, weights=w * weights, minlength=len(buffer))
+
+
+def rasterize_segments(
+        segments: np.ndarray, size: Tuple[int, int], scale: float = 1.0, batch_samples: int = 2 ** 18
+) -> np.ndarray:
+    """ Draws anti-aliased one pixel wide line segments into a coverage buffer.
+        Each segment is sampled at sub-pixel spacing and every sample is splatted
+        onto its four neighbouring pixels with bilinear weights, so the whole
+        batch is drawn with a handful of array operations. Segments are drawn in
+        batches of about batch_samples samples, which bounds the memory used by
+        the temporary arrays regardless of the total line length.
+
+        Returns a float array with shape (height, width) and values between 0.0
+        (empty) and 1.0 (fully covered).
+
+        Args:
+            segments (np.ndarray): segment endpoints with shape (M, 2, 2)
+            size (Tuple[int, int]): size of the buffer in pixels (width, height)
+            scale (float): factor from drawing coordinates to pixels
+            batch_samples (int): approximate number of samples drawn at once
+    """
+    width, height = size
+    segments = np.asarray(segments, dtype=float).reshape(-1, 2, 2) * scale
+    starts = segments[:, 0]
+    deltas = segments[:, 1] - starts
+    lengths = np.hypot(deltas[:, 0], deltas[:, 1])
+
+    # sample each segment at intervals no longer than one pixel
+    counts = np.maximum(np.ceil(lengths).astype(np.intp), 1)
+
+    # split the segments wherever the running sample count passes a multiple of
+    # batch_samples (a single very long segment may exceed it on its own)
+    total_samples = np.cumsum(counts)
+    thresholds = np.arange(batch_samples, total_samples[-1] if len(counts) else 0, batch_samples)
+    bounds = np.unique(np.concatenate(([0], np.searchsorted(total_samples, thresholds) + 1, [len(counts)])))
+
+    buffer = np.zeros((height + 2) * (width + 2))
+    for first, last in zip(bounds[:-1], bounds[1:]):
+        _splat_samples(
+            buffer, starts[first:last], deltas[first:last], lengths[first:last], counts[first:last], size
+        )
+
+    buffer = buffer.reshape(height + 2, width + 2)[1:-1, 1:-1]
+    return np.minimum(buffer, 1.0)
+
+
+def render_preview(
+        layers: Iterable[Path], canvas_size: Tuple[float, float],
+        size: Tuple[int, int] = (256, 256), segments_per_curve: int = 8
+) -> np.ndarray:
+    """ Renders a stack of layers to a grayscale image with dark lines on a white
+        background. Layers may be paths, control point arrays with shape
+        (N, 4, 2), or a single layer stack array with shape (L, N, 4, 2).
+
+        Returns a uint8 array with shape (height, width) suitable for
+        `write_png`.
+
+        Args:
+            layers (Iterable[Path]): layers to draw
+            canvas_size (Tuple[float, float]): size of the drawing (width, height)
+            size (Tuple[int, int]): size of the preview in pixels (width, height)
+            segments_per_curve (int): number of line segments per curve
+    """
+    if isinstance(layers, np.ndarray):
+        controls = layers.reshape(-1, 4, 2)
+    else:
+        controls = np.concatenate([path_to_array(layer) for layer in layers] or [np.empty((0, 4, 2))])
+
+    polylines = flatten_curves(controls, segments_per_curve)
+    segments = np.stack((polylines[:, :-1], polylines[:, 1:]), axis=2)
+
+    scale = min(size[0] / canvas_size[0], size[1] / canvas_size[1])
+    coverage = rasterize_segments(segments, size, scale)
+    return np.round(255 * (1.0 - coverage)).astype(np.uint8)
+
+
+##############################
+# PNG Output                 #
+##############################
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    """ Packs a single PNG chunk with its length and checksum """
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+
+
+def write_png(filename: str, image: np.ndarray, compression: int = 6) -> None:
+    """ Writes an 8 bit grayscale (height, width) or RGB (height, width, 3) image
+        to a PNG file using only zlib for compression.
+
+        Args:
+            filename (str): path of the file to write
+            image (np.ndarray): uint8 pixel data
+            compression (int): zlib compression level from 0 to 9
+    """
+    image = np.asarray(image, dtype=np.uint8)
+    if image.ndim == 2:
+        color_type = 0
+    elif image.ndim == 3 and image.shape[2] == 3:
+        color_type = 2
+    else:
+        raise ValueError("write_png() expects a (height, width) or (height, width, 3) image")
+
+    height, width = image.shape[:2]
+    rows = image.reshape(height, -1)
+    scanlines = np.hstack((np.zeros((height, 1), dtype=np.uint8), rows))  # filter type 0 per row
+
+    header = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    with open(filename, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_png_chunk(b"IHDR", header))
+        f.write(_png_chunk(b"IDAT", zlib.compress(scanlines.tobytes(), compression)))
+        f.write(_png_chunk(b"IEND", b""))
+
+
+def save_preview(
+        filename: str, layers: Iterable[Path], canvas_size: Tuple[float, float],
+        size: Tuple[int, int] = (256, 256), segments_per_curve: int = 8
+) -> None:
+    """ Renders a stack of layers with `render_preview` and writes it to a PNG
+        thumbnail.
+
+        Args:
+            filename (str): path of the file to write
+            layers (Iterable[Path]): layers to draw
+            canvas_size (Tuple[float, float]): size of the drawing (width, height)
+            size (Tuple[int, int]): size of the preview in pixels (width, height)
+            segments_per_curve (int): number of line segments per curve
+    """
+    write_png(filename, render_preview(layers, canvas_size, size, segments_per_curve))
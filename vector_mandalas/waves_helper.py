@@ -110,3 +110,111 @@ def vary_point(
     nx: float = np.cos(theta) * distance + point[0]
     ny: float = np.sin(theta) * distance + point[1]
     return nx, ny
+
+
+def vary_layer(
+        controls: np.ndarray, rng: np.random.Generator, p: float, max_distance: float,
+        reference_point: Point = None, reference_factor: float = 0.0
+) -> np.ndarray:
+    """ Array counterpart of `vary_point` which varies every point of a layer at
+        once. Endpoints shared by adjacent curves are varied together so that
+        continuous layers stay continuous (including closed ones).
+
+    Args:
+        controls (np.ndarray): control points of the layer with shape (N, 4, 2)
+        rng (np.random.Generator): source of randomness for this layer
+        p (float): probability of a variation occuring (ranges 0.0 <= p <= 1.0)
+        max_distance (float): max distance to vary each point
+        reference_point (Point): the target direction for skewing the variation
+        reference_factor (float): degree of skew toward the reference_point
+            (ranges 0.0 <= reference_factor <= 1.0)
+    """
+    if p > 1.0:
+        raise ValueError("p must be a probability on the closed interval [0.0, 1.0]")
+    if reference_factor > 1.0:
+        raise ValueError("reference_factor must be a probability on the closed interval [0.0, 1.0]")
+
+    points = controls.reshape(-1, 2)
+    varied = rng.random(len(points)) < p
+
+    theta = (rng.random(len(points)) * 2 - 1) * np.pi * (1.0 - reference_factor)
+    if reference_point is not None:
+        theta += np.arctan2(reference_point[1] - points[:, 1], reference_point[0] - points[:, 0])
+
+    distance = rng.random(len(points)) * max_distance * varied
+    offsets = np.column_stack((np.cos(theta), np.sin(theta))) * distance[:, None]
+    result = (points + offsets).reshape(controls.shape)
+
+    # reconnect curves which were connected before the variation
+    joined = np.all(controls[:-1, 3] == controls[1:, 0], axis=1)
+    result[:-1, 3][joined] = result[1:, 0][joined]
+    if len(controls) and np.array_equal(controls[-1, 3], controls[0, 0]):
+        result[-1, 3] = result[0, 0]
+    return result
+
+
+def interpolate_layers(
+        keyframes: np.ndarray, positions: List[float], t: List[float], degree: int = None
+) -> np.ndarray:
+    """ Interpolates each corresponding coordinate of the keyframe layers and
+        evaluates it at the positions in t, producing a smooth progression of
+        layers between (and through) the keyframes.
+
+        By default each keyframe interval is a monotone cubic Hermite curve
+        (with Fritsch-Carlson style tangents), so every layer stays within the
+        range of its two neighbouring keyframes. When a degree is given a single
+        polynomial of that degree is fitted through all keyframes instead, which
+        may overshoot them.
+
+    Args:
+        keyframes (np.ndarray): keyframe layers with shape (K, N, 4, 2)
+        positions (List[float]): increasing position of each keyframe along the
+            progression (positions in t outside them are clamped)
+        t (List[float]): positions at which to produce layers
+        degree (int): degree of a global polynomial fit (defaults to piecewise
+            interpolation)
+    """
+    if len(keyframes) != len(positions):
+        raise ValueError("interpolate_layers() needs exactly one position per keyframe")
+
+    positions = np.asarray(positions, dtype=float)
+    t = np.asarray(t, dtype=float)
+    values = keyframes.reshape(len(keyframes), -1)
+
+    if degree is not None:
+        coefficients = np.polynomial.polynomial.polyfit(positions, values, degree)
+        layers = np.polynomial.polynomial.polyval(t, coefficients).T
+        return layers.reshape((-1,) + keyframes.shape[1:])
+
+    if np.any(np.diff(positions) <= 0):
+        raise ValueError("interpolate_layers() needs strictly increasing keyframe positions")
+    if len(keyframes) == 1:
+        return np.repeat(keyframes, len(t), axis=0)
+
+    widths = np.diff(positions)[:, None]
+    slopes = np.diff(values, axis=0) / widths
+
+    # harmonic mean of the neighbouring slopes, or flat at local extremes, keeps
+    # each interval monotone; the end tangents follow the end slopes
+    tangents = np.empty_like(values)
+    tangents[0] = slopes[0]
+    tangents[-1] = slopes[-1]
+    w0 = 2 * widths[1:] + widths[:-1]
+    w1 = widths[1:] + 2 * widths[:-1]
+    same_sign = slopes[:-1] * slopes[1:] > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        harmonic = (w0 + w1) / (w0 / slopes[:-1] + w1 / slopes[1:])
+    tangents[1:-1] = np.where(same_sign, harmonic, 0.0)
+
+    t = np.clip(t, positions[0], positions[-1])
+    interval = np.clip(np.searchsorted(positions, t, side="right") - 1, 0, len(positions) - 2)
+    width = widths[interval]
+    s = ((t - positions[interval]) / width[:, 0])[:, None]
+
+    layers = (
+        (2 * s ** 3 - 3 * s ** 2 + 1) * values[interval]
+        + (s ** 3 - 2 * s ** 2 + s) * width * tangents[interval]
+        + (3 * s ** 2 - 2 * s ** 3) * values[interval + 1]
+        + (s ** 3 - s ** 2) * width * tangents[interval + 1]
+    )
+    return layers.reshape((-1,) + keyframes.shape[1:])
@@ -1,9 +1,11 @@
-import numpy as np
-import svgwrite
 import os
+import sys
 
-from vector_mandalas import bezier, waves_helper
-from vector_mandalas.bezier import Path, Point
+from vector_mandalas import bezier
+from vector_mandalas.bezier import Path
+
+# NumPy, svgwrite and the helper modules are imported inside the functions that
+# use them, so that starting the script (or a worker) does no work up front
 
 
 ##############################
@@ -14,12 +16,17 @@ CANVAS_SIZE = (1000, 1000)
 DIAMETER_RATIO = 0.8
 SPLITS_PER_QUAD = 6
 
-LINE_COLOR = svgwrite.rgb(80, 100, 120)
+LINE_COLOR = "rgb(80,100,120)"  # same as svgwrite.rgb(80, 100, 120)
 
 FILE_Name = "base.svg"
 
 
-def main() -> None:
+def build_layers(
+        canvas_size=CANVAS_SIZE, diameter_ratio=DIAMETER_RATIO, splits_per_quad=SPLITS_PER_QUAD
+) -> list:
+    """ Creates the paths for each layer of the drawing """
+    import numpy as np
+    from vector_mandalas import waves_helper
 
     # collect paths for each layer here
     layers = []
@@ -29,11 +36,11 @@ def main() -> None:
     ##############################
 
     plain_circle: Path = waves_helper.gen_circle(
-        (CANVAS_SIZE[0] / 2, CANVAS_SIZE[1] / 2),
-        DIAMETER_RATIO * CANVAS_SIZE[0] / 2
+        (canvas_size[0] / 2, canvas_size[1] / 2),
+        diameter_ratio * canvas_size[0] / 2
     )
 
-    quarter_splits = list(np.linspace(0.0, 1.0, SPLITS_PER_QUAD, endpoint=False)[1:])
+    quarter_splits = list(np.linspace(0.0, 1.0, splits_per_quad, endpoint=False)[1:])
     base_curves = []
 
     for i, curve in enumerate(plain_circle):
@@ -45,22 +52,89 @@ def main() -> None:
     # Control Variations         #
     ##############################
 
+    return layers
+
+
+def save(layers: list, filename: str, canvas_size=CANVAS_SIZE) -> None:
+    """ Writes the layers to a file whose format is chosen by its extension:
+        .svg, .png (preview), .gcode/.nc/.ngc or .dxf """
+    extension = os.path.splitext(filename)[1].lower()
+
+    if extension == ".svg":
+        import svgwrite
 
+        dwg = svgwrite.Drawing(filename, size=canvas_size, profile='tiny')
+        dwg.stroke(color=LINE_COLOR, width=1)
+        for path in layers:
+            dwg.add(dwg.path(d=bezier.path_to_string(path), fill="none"))
+        dwg.save()
+    elif extension == ".png":
+        from vector_mandalas import preview
+        preview.save_preview(filename, layers, canvas_size)
+    elif extension in (".gcode", ".nc", ".ngc"):
+        from vector_mandalas import export
+        export.write_gcode(filename, layers, canvas_height=canvas_size[1])
+    elif extension == ".dxf":
+        from vector_mandalas import export
+        export.write_dxf(filename, layers, canvas_height=canvas_size[1])
+    else:
+        raise ValueError("unsupported output format: {}".format(filename))
+
+
+def main() -> None:
 
     ##############################
     # Final Drawing              #
     ##############################
 
-    dwg = svgwrite.Drawing(
-        os.path.join('./drawings/', FILE_Name),
-        size=CANVAS_SIZE, profile='tiny'
-    )
-    dwg.stroke(color=LINE_COLOR, width=1)
-    for path in layers:
-        dwg.add(dwg.path(d=bezier.path_to_string(path), fill="none"))
-    dwg.save()
+    save(build_layers(), os.path.join('./drawings/', FILE_Name))
+
+
+def serve(stdin=None, stdout=None) -> None:
+    """ Runs as a persistent worker which keeps one warm interpreter and renders
+        jobs read from stdin until it is closed. Each job is a line of JSON such
+        as {"file": "drawings/a.png", "splits_per_quad": 8}; "file" is required
+        and any other keys are passed to `build_layers`. One line of JSON is
+        written back per job with its file (null when the job could not be
+        read), whether it succeeded and the render time.
+
+        Args:
+            stdin: stream to read jobs from (defaults to sys.stdin)
+            stdout: stream to write results to (defaults to sys.stdout)
+    """
+    stdin = sys.stdin if stdin is None else stdin
+    stdout = sys.stdout if stdout is None else stdout
+
+    import json
+    import time
+
+    # pay for the heavy imports once instead of on the first job
+    import numpy  # noqa: F401
+    import svgwrite  # noqa: F401
+    from vector_mandalas import export, preview, waves_helper  # noqa: F401
+
+    for line in stdin:
+        if not line.strip():
+            continue
+
+        start = time.perf_counter()
+        result = {"file": None, "ok": True}
+        try:
+            job = json.loads(line)
+            result["file"] = filename = job.pop("file")
+            job["canvas_size"] = tuple(job.get("canvas_size", CANVAS_SIZE))
+            save(build_layers(**job), filename, job["canvas_size"])
+        except Exception as e:
+            result.update(ok=False, error="{}: {}".format(type(e).__name__, e))
+        result["seconds"] = round(time.perf_counter() - start, 6)
+
+        stdout.write(json.dumps(result) + "\n")
+        stdout.flush()
 
 
 if __name__ == "__main__":
-    main()
-    print("done")
+    if "--worker" in sys.argv[1:]:
+        serve()
+    else:
+        main()
+        print("done")